@@ -0,0 +1,122 @@
+import os
+import random
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+__all__ = [
+    "ascii_corpus",
+    "cjk_corpus",
+    "formatted_corpus",
+    "bold_italic_corpus",
+    "long_document",
+    "random_formatted",
+    "make_glyph_pack",
+]
+
+_ASCII = "".join(chr(i) for i in range(0x21, 0x7F) if chr(i) != "§")
+_COLORS = "0123456789abcdefghijmnpqstuv"
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def ascii_corpus(n: int = 200, length: int = 24, seed: int = 0) -> List[str]:
+    rng = _rng(seed)
+    return [
+        "".join(rng.choice(_ASCII + " ") for _ in range(length)) for _ in range(n)
+    ]
+
+
+def cjk_corpus(n: int = 200, length: int = 16, seed: int = 1) -> List[str]:
+    rng = _rng(seed)
+    return [
+        "".join(chr(rng.randint(0x4E00, 0x4EFF)) for _ in range(length))
+        for _ in range(n)
+    ]
+
+
+def formatted_corpus(n: int = 200, length: int = 24, seed: int = 2) -> List[str]:
+    """每隔几个字符插入一个颜色或格式代码。"""
+    rng = _rng(seed)
+    out: List[str] = []
+    for _ in range(n):
+        s = ""
+        for _ in range(length):
+            if rng.random() < 0.3:
+                s += "§" + rng.choice(_COLORS + "lor")
+            s += rng.choice(_ASCII)
+        out.append(s)
+    return out
+
+
+def bold_italic_corpus(n: int = 200, length: int = 24, seed: int = 3) -> List[str]:
+    rng = _rng(seed)
+    out: List[str] = []
+    for _ in range(n):
+        s = rng.choice(["§l", "§o", "§l§o"])
+        for _ in range(length):
+            if rng.random() < 0.1:
+                s += rng.choice(["§r", "§l", "§o"])
+            s += rng.choice(_ASCII + " ")
+        out.append(s)
+    return out
+
+
+def long_document(lines: int = 40, seed: int = 4) -> str:
+    rng = _rng(seed)
+    pool = (
+        ascii_corpus(lines, seed=seed)
+        + cjk_corpus(lines, seed=seed + 1)
+        + formatted_corpus(lines, seed=seed + 2)
+    )
+    return "\n".join(rng.choice(pool) for _ in range(lines))
+
+
+def random_formatted(
+    rng: random.Random, max_len: int = 24, newlines: bool = False
+) -> str:
+    """
+    生成带格式代码的随机文本, 覆盖颜色、粗体、斜体、乱码、§r、CJK、
+    无效格式代码、连续的 §§ 以及结尾悬空的 § 等情况。
+    """
+    pieces = [
+        lambda: rng.choice(_ASCII),
+        lambda: " ",
+        lambda: chr(rng.randint(0x4E00, 0x4EFF)),
+        lambda: "§" + rng.choice(_COLORS),
+        lambda: "§" + rng.choice("lokr"),
+        lambda: "§" + rng.choice("wxyz§ "),
+        lambda: "§",
+    ]
+    if newlines:
+        pieces.append(lambda: "\n")
+    weights = [8, 2, 3, 2, 3, 1, 1] + ([1] if newlines else [])
+    return "".join(
+        rng.choices(pieces, weights)[0]() for _ in range(rng.randint(0, max_len))
+    )
+
+
+def make_glyph_pack(root_dir: str, pages=(0x00, 0x4E), seed: int = 0) -> str:
+    """
+    生成一套合成字形图片 (glyph_XX.png), 使基准测试无需真实资源包即可离线运行。
+
+    每个字形为宽度随机的实心矩形, 空格保持空白。
+    """
+    os.makedirs(root_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for group in pages:
+        mat = np.zeros((256, 256), dtype=np.uint8)
+        for row in range(16):
+            for col in range(16):
+                if group == 0 and row == 2 and col == 0:
+                    continue
+                w = int(rng.integers(2, 15))
+                y, x = row * 16, col * 16
+                mat[y + 2 : y + 14, x + 1 : x + 1 + w] = 255
+        Image.fromarray(mat).convert("RGBA").save(
+            os.path.join(root_dir, f"glyph_{group:02X}.png")
+        )
+    return root_dir
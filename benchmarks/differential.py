@@ -0,0 +1,371 @@
+"""
+快速路径与原实现的差分测试。
+
+对每一组 (原实现, 快速实现) 用随机生成的带格式文本反复比较,
+结果不一致时把输入缩减到仍不一致的最小形式后输出。
+
+用法 (在仓库根目录下):
+
+    python -m benchmarks.differential
+    python -m benchmarks.differential -n 5000 --seed 42 -k fit_to_width
+"""
+
+import argparse
+import atexit
+import random
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mctext import align, pad
+from mctext.align import FillerSolver, WidthAccumulator
+from mctext.define import BOLD_PAD, CHAR_HORIZON_PADDING, SPACE_WIDTH
+from mctext.render import SimulateOptions, TellRawSimulator
+from mctext.render_core import RuneFont
+from mctext.shm_cache import SharedGlyphCache, SharedRuneFont
+from mctext.utils import find_closest
+
+from .corpora import make_glyph_pack, random_formatted
+
+Args = Tuple[Any, ...]
+
+
+@dataclass
+class Case:
+    name: str
+    gen: Callable[[random.Random], Args]
+    reference: Callable[..., Any]
+    candidate: Callable[..., Any]
+    # 判断两者结果是否一致; 默认要求相等
+    agree: Callable[[Any, Any], bool] = lambda a, b: a == b
+    # 相对于 -n 的迭代次数比例, 渲染等较慢的用例可以调小
+    weight: float = 1.0
+
+
+def _outcome(fn: Callable[..., Any], args: Args):
+    # 抛出异常也算作一种结果, 两边必须抛出同类异常
+    try:
+        return fn(*args)
+    except Exception as err:
+        return ("raise", type(err).__name__)
+
+
+def _disagree(case: Case, args: Args) -> Optional[Tuple[Any, Any]]:
+    ref = _outcome(case.reference, args)
+    got = _outcome(case.candidate, args)
+    if isinstance(ref, tuple) and ref[:1] == ("raise",):
+        return None if ref == got else (ref, got)
+    if isinstance(got, tuple) and got[:1] == ("raise",):
+        return ref, got
+    return None if case.agree(ref, got) else (ref, got)
+
+
+def _smaller(value: Any) -> List[Any]:
+    if isinstance(value, str):
+        out = [value[:i] + value[i + 1 :] for i in range(len(value))]
+        half = len(value) // 2
+        if half:
+            out[:0] = [value[:half], value[half:]]
+        return out
+    if isinstance(value, bool):
+        return []
+    if isinstance(value, int):
+        return [v for v in {0, 1, value // 2, value - 1} if 0 <= v < value]
+    if isinstance(value, list):
+        out = [value[:i] + value[i + 1 :] for i in range(len(value))]
+        for i, v in enumerate(value):
+            out += [value[:i] + [s] + value[i + 1 :] for s in _smaller(v)]
+        return out
+    return []
+
+
+def shrink(case: Case, args: Args) -> Args:
+    """贪心缩减输入, 直到任何一步缩减都会使两者重新一致。"""
+    changed = True
+    while changed:
+        changed = False
+        for i, value in enumerate(args):
+            for smaller in _smaller(value):
+                trial = args[:i] + (smaller,) + args[i + 1 :]
+                if _disagree(case, trial) is not None:
+                    args = trial
+                    changed = True
+                    break
+            if changed:
+                break
+    return args
+
+
+def _line(rng: random.Random) -> str:
+    return random_formatted(rng)
+
+
+def _accumulated_width(text: str, cuts: List[int]) -> int:
+    acc = WidthAccumulator()
+    prev = 0
+    for cut in sorted(c % (len(text) + 1) for c in cuts):
+        acc.append(text[prev:cut])
+        prev = max(prev, cut)
+    return acc.append(text[prev:]).width
+
+
+def _fit_reference(text: str, spaces: int, ellipsis: str = "…") -> str:
+    # 原做法: 每次去掉一个字符后重新测量
+    if "\n" in text:
+        raise ValueError
+    limit = spaces * SPACE_WIDTH + max(0, spaces - 1) * CHAR_HORIZON_PADDING
+    if align.get_line_width(text) <= limit:
+        return text
+    fmt = False
+    cuts = []
+    codes = ""
+    for i, c in enumerate(text):
+        if c == "§":
+            fmt = True
+            codes += c
+        elif fmt:
+            fmt = False
+            codes += c
+        else:
+            cuts.append((i, len(codes)))
+    for i, n in reversed(cuts):
+        cand = text[:i] + ellipsis + codes[n:]
+        if align.get_line_width(cand) <= limit:
+            return cand
+    return ""
+
+
+def _filled_widths(widths: List[int], fills: Optional[List[str]]):
+    if fills is None:
+        return None
+    base = align.get_line_width("x")
+    return [w + align.get_line_width("x" + f) - base for w, f in zip(widths, fills)]
+
+
+def _resolve_reference(widths: List[int]):
+    res = pad.resolve(widths)
+    if res is None:
+        return None
+    return [w + ns * pad.S + nb * pad.B for w, (ns, nb) in zip(widths, res)]
+
+
+_RESET = ("", False, False)
+
+
+def _complete(text: str) -> str:
+    # 结尾悬空的 § 会吞掉填充开头的 §r, 原文本本身就不完整, 不在此检查
+    return text.rstrip("§")
+
+
+def _filler_style(text: str, fill: str):
+    # 填充字符不应带有颜色、乱码或斜体, 填充之后应回到无格式状态
+    leaked = False
+    fmt = False
+    for i, c in enumerate(fill):
+        if c == "§":
+            fmt = True
+        elif fmt:
+            fmt = False
+        else:
+            color, _, italic = align.get_last_style(text + fill[:i])
+            leaked = leaked or bool(color) or italic
+    return align.get_last_style(text + fill), leaked
+
+
+def _pad_styles(texts: List[str]):
+    texts = [_complete(t) for t in texts]
+    return [_filler_style(t, out[len(t) :]) for t, out in zip(texts, pad.pad(texts))]
+
+
+def _align_style_reference(text: str, spaces: int):
+    text = _complete(text)
+    # 放不下时不加填充, 格式保持原样
+    if align.get_line_width(text) > spaces * SPACE_WIDTH:
+        return align.get_last_style(text)
+    return _RESET
+
+
+def _closest_reference(target: int) -> int:
+    _, diff = find_closest(
+        SPACE_WIDTH + CHAR_HORIZON_PADDING,
+        SPACE_WIDTH + BOLD_PAD + CHAR_HORIZON_PADDING,
+        target,
+    )
+    return abs(int(diff))
+
+
+def _closest_candidate(target: int) -> int:
+    fill, diff = FillerSolver().closest(target)
+    base = align.get_line_width("x")
+    assert align.get_line_width("x" + fill) - base == target + diff
+    return abs(diff)
+
+
+_glyph_dir: Optional[str] = None
+_sims: Tuple[TellRawSimulator, ...] = ()
+
+
+def _simulators() -> Tuple[TellRawSimulator, ...]:
+    global _glyph_dir, _sims
+    if _glyph_dir is None:
+        _glyph_dir = make_glyph_pack(tempfile.mkdtemp(prefix="mctext-diff-"))
+        atexit.register(shutil.rmtree, _glyph_dir, ignore_errors=True)
+        cache = SharedGlyphCache(_glyph_dir)
+        atexit.register(cache.unlink)
+        _sims = (
+            TellRawSimulator(RuneFont(_glyph_dir), SimulateOptions()),
+            TellRawSimulator(SharedRuneFont(_glyph_dir, cache), SimulateOptions()),
+            TellRawSimulator(RuneFont(_glyph_dir), SimulateOptions()),
+        )
+    return _sims
+
+
+def _render(text: str):
+    return np.array(_simulators()[0](text))
+
+
+def _render_shared(text: str):
+    return np.array(_simulators()[1](text))
+
+
+def _render_runs(runs: List[str]):
+    return np.array(_simulators()[2](runs))
+
+
+def _render_joined(runs: List[str]):
+    return np.array(_simulators()[0]("".join(runs)))
+
+
+def _image_size(text: str):
+    h, w = _render(text).shape[:2]
+    return w, h
+
+
+def _measure_size(text: str):
+    return _simulators()[2].measure(text).size
+
+
+def _same_image(a, b) -> bool:
+    return a.shape == b.shape and bool((a == b).all())
+
+
+CASES: List[Case] = [
+    Case(
+        "get_line_width[memo]",
+        lambda rng: (_line(rng),),
+        align.get_line_width.__wrapped__,
+        align.get_line_width,
+    ),
+    Case(
+        "get_line_width[accumulator]",
+        lambda rng: (_line(rng), [rng.randint(0, 30) for _ in range(rng.randint(0, 4))]),
+        lambda text, cuts: align.get_line_width.__wrapped__(text),
+        _accumulated_width,
+    ),
+    Case(
+        "fit_to_width",
+        lambda rng: (_line(rng), rng.randint(1, 10)),
+        _fit_reference,
+        align.fit_to_width,
+    ),
+    Case(
+        "pad.resolve",
+        lambda rng: ([rng.randint(0, 200) for _ in range(rng.randint(1, 5))],),
+        _resolve_reference,
+        lambda widths: _filled_widths(
+            widths, align.default_filler_solver.fill_column(widths)
+        ),
+    ),
+    Case(
+        "pad.pad[style]",
+        lambda rng: ([random_formatted(rng, 12) for _ in range(rng.randint(1, 4))],),
+        # 空列表时 pad 抛出的异常也要一致
+        lambda texts: [(_RESET, False)] * len(pad.pad(texts)),
+        _pad_styles,
+    ),
+    Case(
+        "align_left[style]",
+        lambda rng: (random_formatted(rng, 12), rng.randint(0, 12)),
+        _align_style_reference,
+        lambda text, spaces: align.get_last_style(
+            align.align_left(_complete(text), spaces)
+        ),
+    ),
+    Case(
+        "find_closest",
+        lambda rng: (rng.randint(0, 600),),
+        _closest_reference,
+        _closest_candidate,
+        # 快速实现允许不使用普通空格, 误差只能更小
+        agree=lambda ref, got: got <= ref,
+    ),
+    Case(
+        "TellRawSimulator[measure]",
+        lambda rng: (random_formatted(rng, 16, newlines=True),),
+        _image_size,
+        _measure_size,
+        weight=0.05,
+    ),
+    Case(
+        "TellRawSimulator[runs]",
+        lambda rng: ([random_formatted(rng, 6) for _ in range(rng.randint(1, 4))],),
+        _render_joined,
+        _render_runs,
+        agree=_same_image,
+        weight=0.05,
+    ),
+    Case(
+        "TellRawSimulator[shared_cache]",
+        lambda rng: (random_formatted(rng, 16, newlines=True),),
+        _render,
+        _render_shared,
+        agree=_same_image,
+        weight=0.05,
+    ),
+]
+
+
+def run_case(case: Case, seed: int, iterations: int) -> Optional[Dict[str, Any]]:
+    rng = random.Random(f"{seed}:{case.name}")
+    for _ in range(max(1, int(iterations * case.weight))):
+        args = case.gen(rng)
+        if _disagree(case, args) is None:
+            continue
+        minimal = shrink(case, args)
+        ref, got = _disagree(case, minimal) or (None, None)
+        return {"input": minimal, "reference": ref, "candidate": got}
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="mctext differential tests")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的用例")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for case in CASES:
+        if args.filter not in case.name:
+            continue
+        failure = run_case(case, args.seed, args.iterations)
+        if failure is None:
+            print(f"ok   {case.name}", flush=True)
+            continue
+        failed += 1
+        print(f"FAIL {case.name}")
+        print(f"     input:     {failure['input']!r}")
+        ref, got = failure["reference"], failure["candidate"]
+        if isinstance(ref, np.ndarray):
+            ref, got = ref.shape, getattr(got, "shape", got)
+        print(f"     reference: {ref!r}")
+        print(f"     candidate: {got!r}", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+mctext 热点路径的基准测试。
+
+用法 (在仓库根目录下):
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 1.25
+
+指定 --baseline 时, 任一项最佳耗时超过 基线 * 阈值 即视为性能回退,
+进程以非零状态码退出。
+"""
+
+import argparse
+import atexit
+import json
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from mctext import align, pad
+from mctext.define import BOLD_PAD, CHAR_HORIZON_PADDING, SPACE_WIDTH
+from mctext.render import SimulateOptions, TellRawSimulator, _shear_image
+from mctext.render_core import RuneFont
+from mctext.utils import find_closest
+
+from .corpora import (
+    ascii_corpus,
+    bold_italic_corpus,
+    cjk_corpus,
+    formatted_corpus,
+    long_document,
+    make_glyph_pack,
+)
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """注册一个基准。被装饰的函数负责准备数据并返回待计时的无参函数。"""
+
+    def deco(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return deco
+
+
+_CORPORA = {
+    "ascii": ascii_corpus(),
+    "cjk": cjk_corpus(),
+    "formatted": formatted_corpus(),
+    "bold_italic": bold_italic_corpus(),
+}
+_GLYPH_DIR = tempfile.mkdtemp(prefix="mctext-bench-")
+make_glyph_pack(_GLYPH_DIR)
+atexit.register(shutil.rmtree, _GLYPH_DIR, ignore_errors=True)
+
+
+def _each(fn: Callable[[str], object], corpus: list[str]):
+    def run():
+        # 清空行宽缓存, 避免只测到缓存命中
+        align.get_line_width.cache_clear()
+        for s in corpus:
+            fn(s)
+
+    return run
+
+
+for _name, _corpus in _CORPORA.items():
+    benchmark(f"get_line_width[{_name}]")(
+        lambda c=_corpus: _each(align.get_line_width.__wrapped__, c)
+    )
+    benchmark(f"cut_by_length[{_name}]")(
+        lambda c=_corpus: _each(lambda s: align.cut_by_length(s, 8), c)
+    )
+
+
+@benchmark("get_line_width[memo_hit]")
+def _line_width_hit():
+    corpus = _CORPORA["formatted"]
+    for s in corpus:
+        align.get_line_width(s)
+
+    def run():
+        for s in corpus:
+            align.get_line_width(s)
+
+    return run
+
+
+@benchmark("WidthAccumulator")
+def _width_accumulator():
+    # 每行按 4 个字符一段追加, 模拟逐段拼接的构建过程
+    rows = [
+        [s[i : i + 4] for i in range(0, len(s), 4)]
+        for s in _CORPORA["formatted"] + _CORPORA["cjk"]
+    ]
+
+    def run():
+        for segments in rows:
+            acc = align.WidthAccumulator()
+            for seg in segments:
+                acc.append(seg)
+            acc.width
+
+    return run
+
+
+@benchmark("cut_by_length[long_document]")
+def _cut_long():
+    doc = long_document(400)
+    return lambda: align.cut_by_length(doc, 20)
+
+
+@benchmark("fit_to_width")
+def _fit_to_width():
+    names = _CORPORA["formatted"] + _CORPORA["cjk"]
+    return _each(lambda s: align.fit_to_width(s, 6), names)
+
+
+@benchmark("align_simple")
+def _align_simple():
+    rows = list(zip(_CORPORA["ascii"], _CORPORA["formatted"]))
+
+    def run():
+        align.get_line_width.cache_clear()
+        for a, b in rows:
+            align.align_simple((a[:8], 20), (20, b[:8]), "|")
+
+    return run
+
+
+@benchmark("pad_with_format")
+def _pad_with_format():
+    rows = [
+        f"{a[:6]}(pad1){b[:4]}(pad2){c[:5]}"
+        for a, b, c in zip(
+            _CORPORA["ascii"][:40], _CORPORA["cjk"][:40], _CORPORA["formatted"][:40]
+        )
+    ]
+    text = "\n".join(rows)
+
+    def run():
+        align.get_line_width.cache_clear()
+        pad.pad_with_format(text)
+
+    return run
+
+
+@benchmark("find_closest")
+def _find_closest():
+    a = SPACE_WIDTH + CHAR_HORIZON_PADDING
+    b = a + BOLD_PAD
+
+    def run():
+        for c in range(0, 600, 7):
+            find_closest(a, b, c)
+
+    return run
+
+
+@benchmark("RuneFont[cold]")
+def _runefont_cold():
+    chars = "".join(_CORPORA["ascii"][:4] + _CORPORA["cjk"][:4])
+
+    def run():
+        font = RuneFont(_GLYPH_DIR)
+        for c in chars:
+            font(c, 0)
+
+    return run
+
+
+@benchmark("RuneFont[warm]")
+def _runefont_warm():
+    chars = "".join(_CORPORA["ascii"][:4] + _CORPORA["cjk"][:4])
+    font = RuneFont(_GLYPH_DIR)
+    for c in chars:
+        font(c, 0)
+
+    def run():
+        for c in chars:
+            font(c, 0)
+
+    return run
+
+
+@benchmark("_shear_image")
+def _shear():
+    mat = np.random.default_rng(0).integers(0, 255, (31, 120, 4), dtype=np.uint8)
+    k = np.tanh(np.deg2rad(15))
+    return lambda: _shear_image(mat, k)
+
+
+@benchmark("TellRawSimulator[formatted]")
+def _render_formatted():
+    sim = TellRawSimulator(RuneFont(_GLYPH_DIR), SimulateOptions())
+    text = "\n".join(_CORPORA["formatted"][:10])
+    return lambda: sim(text)
+
+
+@benchmark("TellRawSimulator[long_document]")
+def _render_long():
+    sim = TellRawSimulator(RuneFont(_GLYPH_DIR), SimulateOptions())
+    text = long_document(40)
+    return lambda: sim(text)
+
+
+def measure(fn: Callable[[], object], min_time: float, repeat: int) -> dict:
+    # 先估计一次调用的耗时, 以决定每轮循环次数
+    t0 = time.perf_counter()
+    fn()
+    once = time.perf_counter() - t0
+    loops = max(1, int(min_time / max(once, 1e-9)))
+    times: list[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - t0) / loops)
+    return {
+        "best": min(times),
+        "mean": sum(times) / len(times),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions: list[str] = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = res["best"] / base["best"]
+        res["baseline"] = base["best"]
+        res["ratio"] = ratio
+        res["regressed"] = ratio > base.get("threshold", threshold)
+        if res["regressed"]:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="mctext benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的基准")
+    parser.add_argument("-o", "--output", help="结果 JSON 的输出路径")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="默认回退阈值 (当前/基线), 基线中每项的 threshold 字段优先",
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results: dict = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        res = measure(setup(), args.min_time, args.repeat)
+        results[name] = res
+        print(f"{name:40s} {res['best'] * 1e3:10.3f} ms", flush=True)
+
+    regressions: list[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            print(f"REGRESSION {name}: x{results[name]['ratio']:.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"threshold": args.threshold, "results": results},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
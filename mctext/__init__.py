@@ -1 +1 @@
-from . import align, render_core, render, cmd_helper, pad
\ No newline at end of file
+from . import align, render_core, render, cmd_helper, pad, lang, profiling, aio, shm_cache
\ No newline at end of file
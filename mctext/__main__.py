@@ -0,0 +1,188 @@
+"""
+批量处理 JSONL 任务:
+
+    python -m mctext jobs.jsonl --font glyphs/ -o results.jsonl
+    cat jobs.jsonl | python -m mctext --font glyphs/ --workers 8
+
+每行一个任务, op 为以下之一:
+
+    {"op": "render", "text": "...", "output": "a.png"}
+    {"op": "render", "tellraw": {"rawtext": [...]}, "output": "a.png"}
+    {"op": "measure", "text": "...", "boxes": false}
+    {"op": "align", "mode": "left" | "right" | "center", "text": "...", "spaces": 20}
+    {"op": "align", "parts": [["name", 20], [10, "value"], "|"]}
+    {"op": "pad", "text": "a(pad1)b\\ncc(pad1)d"}
+
+tellraw 任务还可以带 selectors_sub / scores_sub。任务可带 id, 否则以行号作为 id。
+每个任务输出一行 {"id", "ok", "result" | "error", "time"}, 顺序与输入一致。
+输入按块流式读取, 同时处理中的块数有上限, 内存占用与输入大小无关。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Deque, Iterator, List, Optional, Tuple
+
+from . import align, pad
+from .cmd_helper import rawtext_runs, translate_tellraw
+from .render import SimulateOptions, TellRawSimulator
+from .render_core import RuneFont
+from .shm_cache import SharedGlyphCache, SharedRuneFont
+
+_simulator: Optional[TellRawSimulator] = None
+
+
+def _init_worker(font_dir: Optional[str], shared_cache: bool = False) -> None:
+    # 每个进程只创建一次字体, 字形缓存在该进程处理的所有任务间复用
+    global _simulator
+    if font_dir is not None:
+        font = SharedRuneFont(font_dir) if shared_cache else RuneFont(font_dir)
+        _simulator = TellRawSimulator(font, SimulateOptions())
+
+
+def _get_simulator() -> TellRawSimulator:
+    if _simulator is None:
+        raise ValueError("This job needs --font")
+    return _simulator
+
+
+def _job_text(job: dict):
+    if "tellraw" in job:
+        translated = translate_tellraw(
+            {"rawtext": list(job["tellraw"]["rawtext"])},
+            selectors_sub=job.get("selectors_sub", {}),
+            scores_sub=job.get("scores_sub", {}),
+        )
+        return rawtext_runs(translated)
+    return job["text"]
+
+
+def _run_job(job: dict):
+    op = job.get("op")
+    if op == "render":
+        image = _get_simulator()(_job_text(job))
+        if "output" in job:
+            image.save(job["output"])
+        return {"output": job.get("output"), "size": list(image.size)}
+    elif op == "measure":
+        metrics = _get_simulator().measure(_job_text(job))
+        result = {
+            "width": metrics.width,
+            "height": metrics.height,
+            "line_widths": metrics.line_widths,
+        }
+        if job.get("boxes"):
+            result["char_boxes"] = metrics.char_boxes
+        return result
+    elif op == "align":
+        if "parts" in job:
+            parts = [p if isinstance(p, str) else tuple(p) for p in job["parts"]]
+            return align.align_simple(*parts)
+        mode = job.get("mode", "left")
+        if mode == "left":
+            return align.align_left(job["text"], job["spaces"])
+        elif mode == "right":
+            return align.align_right(job["text"], job["spaces"])
+        elif mode == "center":
+            return align.align_center(job["text"], job["spaces"])
+        raise ValueError(f"Unknown align mode: {mode}")
+    elif op == "pad":
+        return pad.pad_with_format(job["text"])
+    raise ValueError(f"Unknown op: {op}")
+
+
+def _run_chunk(chunk: List[Tuple[int, str]]) -> List[str]:
+    out: List[str] = []
+    for lineno, line in chunk:
+        t0 = time.perf_counter()
+        job_id = lineno
+        try:
+            job = json.loads(line)
+            job_id = job.get("id", lineno)
+            res = {"id": job_id, "ok": True, "result": _run_job(job)}
+        except Exception as err:
+            res = {"id": job_id, "ok": False, "error": f"{type(err).__name__}: {err}"}
+        res["time"] = time.perf_counter() - t0
+        out.append(json.dumps(res, ensure_ascii=False))
+    return out
+
+
+def _chunks(fp: IO[str], size: int) -> Iterator[List[Tuple[int, str]]]:
+    lines = ((i, ln) for i, ln in enumerate(fp, 1) if ln.strip())
+    while chunk := list(islice(lines, size)):
+        yield chunk
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mctext", description="Run JSONL render/measure/align/pad jobs"
+    )
+    parser.add_argument("input", nargs="?", default="-", help="任务文件, - 为标准输入")
+    parser.add_argument("-o", "--output", default="-", help="结果文件, - 为标准输出")
+    parser.add_argument("--font", help="字形图片目录, render/measure 任务需要")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="工作进程数, 默认为 CPU 核数, 0 为在当前进程中运行",
+    )
+    parser.add_argument("--chunk-size", type=int, default=64, help="每次提交的任务数")
+    parser.add_argument(
+        "--max-pending", type=int, default=0, help="同时处理中的块数, 默认为进程数的 4 倍"
+    )
+    parser.add_argument(
+        "--shared-cache",
+        action="store_true",
+        help="工作进程通过共享内存共用解码后的字形页",
+    )
+    args = parser.parse_args(argv)
+
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    fout = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        chunks = _chunks(fin, max(1, args.chunk_size))
+        if args.workers <= 0:
+            _init_worker(args.font, args.shared_cache)
+            for chunk in chunks:
+                for line in _run_chunk(chunk):
+                    fout.write(line + "\n")
+                fout.flush()
+            return 0
+        max_pending = args.max_pending or args.workers * 4
+        with ProcessPoolExecutor(
+            args.workers,
+            initializer=_init_worker,
+            initargs=(args.font, args.shared_cache),
+        ) as executor:
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_run_chunk, chunk))
+                # 按提交顺序写出, 并限制挂起的块数
+                while pending and (len(pending) >= max_pending or pending[0].done()):
+                    for line in pending.popleft().result():
+                        fout.write(line + "\n")
+                    fout.flush()
+            while pending:
+                for line in pending.popleft().result():
+                    fout.write(line + "\n")
+                fout.flush()
+        return 0
+    finally:
+        if args.shared_cache and args.font is not None:
+            SharedGlyphCache(args.font).unlink()
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
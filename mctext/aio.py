@@ -0,0 +1,130 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL.Image import Image as PILImage
+
+from .render import LayoutMetrics, SimulateOptions, TellRawSimulator, _get_font
+
+__all__ = ["AsyncRenderer", "arender", "arender_many", "ameasure"]
+
+
+def _run(
+    img_dir_path: str,
+    opt: SimulateOptions,
+    text: str | Tuple[str, ...],
+    measure_only: bool,
+):
+    # 在执行器中运行; 进程池时每个进程各自缓存字体
+    simulator = TellRawSimulator(_get_font(img_dir_path), opt)
+    if measure_only:
+        return simulator.measure(text)
+    return simulator(text)
+
+
+class AsyncRenderer:
+    """
+    TellRawSimulator 的 asyncio 封装。
+
+    渲染在执行器中进行, 不阻塞事件循环; 同时进行的相同请求只会渲染一次
+    (并得到同一个结果对象), 同时在执行器中运行的请求数不超过 max_in_flight。
+
+    Args:
+        img_dir_path (str): 字形图片目录
+        opt (SimulateOptions | None): 渲染选项
+        executor (Executor | None): 执行器, 默认使用事件循环的默认线程池
+        max_in_flight (int): 同时提交到执行器的最大请求数
+    """
+
+    def __init__(
+        self,
+        img_dir_path: str,
+        opt: Optional[SimulateOptions] = None,
+        *,
+        executor: Optional[Executor] = None,
+        max_in_flight: int = 8,
+    ) -> None:
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self.img_dir_path = img_dir_path
+        self.opt = opt or SimulateOptions()
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[Tuple[bool, str | Tuple[str, ...]], asyncio.Future] = {}
+
+    def _bind_loop(self) -> None:
+        # 信号量与挂起的 Future 都属于某个事件循环, 换循环时重新创建
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._pending = {}
+
+    async def _submit(self, text: str | Iterable[str], measure_only: bool):
+        self._bind_loop()
+        key_text = text if isinstance(text, str) else tuple(text)
+        key = (measure_only, key_text)
+        fut = self._pending.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._execute(key_text, measure_only))
+            self._pending[key] = fut
+            fut.add_done_callback(lambda _: self._pending.pop(key, None))
+        # 一个等待者被取消时不影响其他等待同一结果的协程
+        return await asyncio.shield(fut)
+
+    async def _execute(self, text: str | Tuple[str, ...], measure_only: bool):
+        assert self._semaphore is not None
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, _run, self.img_dir_path, self.opt, text, measure_only
+            )
+
+    async def render(self, text: str | Iterable[str]) -> PILImage:
+        return await self._submit(text, False)
+
+    async def measure(self, text: str | Iterable[str]) -> LayoutMetrics:
+        return await self._submit(text, True)
+
+    async def render_many(self, texts: Iterable[str | Iterable[str]]) -> List[PILImage]:
+        return list(await asyncio.gather(*(self.render(t) for t in texts)))
+
+    async def measure_many(
+        self, texts: Iterable[str | Iterable[str]]
+    ) -> List[LayoutMetrics]:
+        return list(await asyncio.gather(*(self.measure(t) for t in texts)))
+
+
+_renderers: Dict[Tuple[str, str], AsyncRenderer] = {}
+
+
+def _get_renderer(img_dir_path: str, opt: Optional[SimulateOptions]) -> AsyncRenderer:
+    # SimulateOptions 含 dict 不可哈希, 以 repr 作键, 内容相同的选项共用一个渲染器
+    opt = opt or SimulateOptions()
+    key = (img_dir_path, repr(opt))
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = _renderers[key] = AsyncRenderer(img_dir_path, opt)
+    return renderer
+
+
+async def arender(
+    img_dir_path: str, text: str | Iterable[str], opt: SimulateOptions | None = None
+) -> PILImage:
+    return await _get_renderer(img_dir_path, opt).render(text)
+
+
+async def arender_many(
+    img_dir_path: str,
+    texts: Iterable[str | Iterable[str]],
+    opt: SimulateOptions | None = None,
+) -> List[PILImage]:
+    return await _get_renderer(img_dir_path, opt).render_many(texts)
+
+
+async def ameasure(
+    img_dir_path: str, text: str | Iterable[str], opt: SimulateOptions | None = None
+) -> LayoutMetrics:
+    return await _get_renderer(img_dir_path, opt).measure(text)
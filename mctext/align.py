@@ -1,4 +1,6 @@
 import numpy
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
 from .define import (
     BOLD_PAD,
@@ -8,17 +10,20 @@ from .define import (
 )
 
 from .render_core import RuneFont
-from .utils import find_closest
+from .utils import MinCountTable
 
 with open(Path(__file__).parent / "font_widths.dat", "rb") as f:
     _warr = numpy.fromfile(f, dtype=numpy.uint8)
 
+LINE_WIDTH_CACHE_SIZE = 8192
+
 
 def get_char_width(char: str, bold=False) -> int:
     idx = RuneFont.rune_to_raw_idx(char)
     return int(_warr[idx] + (BOLD_PAD if bold else 0))
 
 
+@lru_cache(maxsize=LINE_WIDTH_CACHE_SIZE)
 def get_line_width(line: str) -> int:
     if "\n" in line:
         raise ValueError("Line contains newline; use get_lines_length instead")
@@ -49,23 +54,173 @@ def get_line_width(line: str) -> int:
     return width
 
 
+class WidthAccumulator:
+    """
+    增量计算文本宽度。
+
+    维护已追加文本的宽度与格式状态, 追加文本时只扫描新追加的部分,
+    width 与 get_line_width(已追加的全部文本) 一致。
+
+    Args:
+        text (str): 初始文本
+    """
+
+    def __init__(self, text: str = "") -> None:
+        self._chars_width = 0
+        self._length = 0
+        self._color = ""
+        self._bold = False
+        self._italic = False
+        self._fmt = False
+        if text:
+            self.append(text)
+
+    def append(self, text: str) -> "WidthAccumulator":
+        if "\n" in text:
+            raise ValueError("Text contains newline; use one accumulator per line")
+        chars_width = self._chars_width
+        length = self._length
+        _bold = self._bold
+        _fmt = self._fmt
+        for char in text:
+            if char == "§":
+                _fmt = True
+                continue
+            elif _fmt:
+                _fmt = False
+                if char == "l":
+                    _bold = True
+                elif char == "o":
+                    self._italic = True
+                elif char == "r":
+                    _bold = False
+                    self._italic = False
+                    self._color = ""
+                else:
+                    self._color = char
+                continue
+            length += 1
+            chars_width += get_char_width(char, _bold)
+        self._chars_width = chars_width
+        self._length = length
+        self._bold = _bold
+        self._fmt = _fmt
+        return self
+
+    def copy(self) -> "WidthAccumulator":
+        acc = WidthAccumulator.__new__(WidthAccumulator)
+        acc.__dict__.update(self.__dict__)
+        return acc
+
+    @property
+    def width(self) -> int:
+        width = self._chars_width + max(0, self._length - 1) * CHAR_HORIZON_PADDING
+        if self._italic:
+            width += ITALIC_CHAR_HORIZON_PADDING
+        return width
+
+    @property
+    def style(self) -> tuple[str, bool, bool]:
+        """当前的 (颜色, 粗体, 斜体), 格式代码按 get_line_width 的规则解析。"""
+        return self._color, self._bold, self._italic
+
+
 def get_lines_width(lines: list[str]) -> int:
     return max(get_line_width(line) for line in lines)
 
 
+class FillerSolver:
+    """
+    用若干种填充字符精确凑出指定宽度, 且使用的字符数最少。
+
+    每个填充字符占用 字符宽度 + CHAR_HORIZON_PADDING, 宽度取自字宽表。
+    默认只使用空格与粗体空格; 可以加入更窄的字符 (例如 (".", False))
+    使更多宽度可以被精确凑出, 输出也更短。
+
+    Args:
+        fillers: (字符, 是否粗体) 的序列
+        max_width (int): 预先计算的最大宽度, 超出时按需扩展
+    """
+
+    def __init__(
+        self,
+        fillers: tuple[tuple[str, bool], ...] = ((" ", False), (" ", True)),
+        max_width: int = 1024,
+    ) -> None:
+        self.fillers = tuple(fillers)
+        self.costs = [
+            get_char_width(glyph, bold) + CHAR_HORIZON_PADDING
+            for glyph, bold in self.fillers
+        ]
+        self.table = MinCountTable(self.costs, max_width)
+        self.cached_fill: dict[int, str | None] = {}
+
+    def exact(self, width: int) -> str | None:
+        """
+        返回宽度恰好为 width 的填充文本, 无解时返回 None。
+
+        填充文本以 §r 开头并以普通样式结束 (width 为 0 时即为 "§r"),
+        前面文本的颜色、乱码等格式不会作用到填充字符与后续文本上。
+        """
+        if width in self.cached_fill:
+            return self.cached_fill[width]
+        counts = self.table.solve(width)
+        if counts is None:
+            fill = None
+        else:
+            plain = "".join(
+                g * n for (g, bold), n in zip(self.fillers, counts) if not bold
+            )
+            bold = "".join(g * n for (g, bold), n in zip(self.fillers, counts) if bold)
+            fill = "§r"
+            if bold:
+                fill += "§l" + bold + "§r"
+            fill += plain
+        self.cached_fill[width] = fill
+        return fill
+
+    def closest(self, width: int) -> tuple[str, int]:
+        """返回最接近 width 的填充文本及其 (实际宽度 - width)。"""
+        if width <= 0:
+            return "§r", -width
+        for d in range(0, max(self.costs) + 1):
+            if (fill := self.exact(width - d)) is not None:
+                return fill, -d
+            if (fill := self.exact(width + d)) is not None:
+                return fill, d
+        raise ValueError(f"No filler close to width {width}")
+
+    def fill_column(self, widths: list[int]) -> list[str] | None:
+        """
+        为一列文本求出填充, 使填充后宽度相同且尽量窄。
+
+        Returns:
+            list[str] | None: 每行的填充文本; 宽度之差无法凑出时返回 None
+        """
+        if not widths:
+            return None
+        g = self.table.gcd
+        if any((w - widths[0]) % g for w in widths):
+            return None
+        target = max(widths)
+        while True:
+            fills = [self.exact(target - w) for w in widths]
+            if all(f is not None for f in fills):
+                return fills  # type: ignore[return-value]
+            target += g
+
+
+default_filler_solver = FillerSolver()
+
+
 def get_specific_length_spaces(length: int):
     return get_specific_length_spaces_and_diff(length)[0]
 
 
-def get_specific_length_spaces_and_diff(length: int, *, prev_diff=0):
-    solutions, min_diff = find_closest(
-        SPACE_WIDTH + CHAR_HORIZON_PADDING,
-        SPACE_WIDTH + BOLD_PAD + CHAR_HORIZON_PADDING,
-        length + prev_diff,
-    )
-    a, b, _ = solutions[0]
-    s = "§l" + " " * b + "§r" + " " * a
-    return s, int(min_diff)
+def get_specific_length_spaces_and_diff(
+    length: int, *, prev_diff=0, solver: FillerSolver | None = None
+):
+    return (solver or default_filler_solver).closest(length + prev_diff)
 
 
 def get_last_style(line: str):
@@ -156,6 +311,77 @@ def cut_by_length(line: str, _spaces: int, keep_last_style=True) -> list[str]:
     return outputs
 
 
+def fit_to_width(text: str, _spaces: int, ellipsis: str = "…") -> str:
+    """
+    将文本截断到给定长度以内, 被截断时在末尾加上省略号。
+
+    只扫描一遍文本建立前缀宽度数组, 再二分查找截断位置。
+    截断位置之前的格式代码会被保留, 省略号沿用截断处的格式;
+    截断位置之后的格式代码 (如结尾的 §r) 接在省略号后面, 避免格式泄漏到后续文本。
+
+    Args:
+        text (str): 单行文本
+        _spaces (int): 最大长度 (以空格宽度为单位)
+        ellipsis (str): 省略号
+
+    Returns:
+        str: 截断后的文本; 连省略号都放不下时返回空字符串
+    """
+    if "\n" in text:
+        raise ValueError("Text contains newline; fit each line separately")
+    limit = _spaces * SPACE_WIDTH + max(0, _spaces - 1) * CHAR_HORIZON_PADDING
+    if get_line_width(text) <= limit:
+        return text
+    e_len = len(ellipsis)
+    e_width = sum(get_char_width(c) for c in ellipsis)
+    # 保留 k 个可见字符时的截断下标与总宽度 (含省略号)
+    cuts: list[int] = []
+    fits: list[int] = []
+    # 格式代码 (含 § 本身) 的下标
+    codes: list[int] = []
+    width = 0
+    _bold = False
+    _italic = False
+    _fmt = False
+    for i, char in enumerate(text):
+        if char == "§":
+            _fmt = True
+            codes.append(i)
+            continue
+        elif _fmt:
+            _fmt = False
+            codes.append(i)
+            if char == "l":
+                _bold = True
+            elif char == "o":
+                _italic = True
+            elif char == "r":
+                _bold = False
+                _italic = False
+            continue
+        k = len(cuts)
+        cuts.append(i)
+        fits.append(
+            width
+            + e_width
+            + (e_len * BOLD_PAD if _bold else 0)
+            + max(0, k + e_len - 1) * CHAR_HORIZON_PADDING
+        )
+        width += get_char_width(char, _bold)
+    # 末尾接上了剩余的格式代码, 结尾是否斜体与原文本一致
+    if _italic:
+        fits = [w + ITALIC_CHAR_HORIZON_PADDING for w in fits]
+    # 粗体的切换可能使宽度略微回落, 取后缀最小值使其单调
+    for k in range(len(fits) - 2, -1, -1):
+        if fits[k + 1] < fits[k]:
+            fits[k] = fits[k + 1]
+    k = bisect_right(fits, limit) - 1
+    if k < 0:
+        return ""
+    tail = "".join(text[i] for i in codes if i > cuts[k])
+    return text[: cuts[k]] + ellipsis + tail
+
+
 def align_any_and_get_diff(text: str, spaces: int, *, prev_diff=0):
     width = get_line_width(text)
     spaces_left = spaces * SPACE_WIDTH - width
@@ -1,5 +1,12 @@
+from .lang import LangFile
+
+
 def translate_tellraw(
-    jsonc: dict, *, selectors_sub: dict[str, str], scores_sub: dict[str, dict[str, int]]
+    jsonc: dict,
+    *,
+    selectors_sub: dict[str, str],
+    scores_sub: dict[str, dict[str, int]],
+    lang: LangFile | None = None,
 ):
     rawtext = jsonc["rawtext"]
     if not isinstance(rawtext, list):
@@ -21,6 +28,71 @@ def translate_tellraw(
             else:
                 rawtext[i] = {"text": ""}
         elif "translate" in element:
+            if lang is None:
+                continue
             translates = element["translate"]
+            args = _translate_args(
+                element.get("with"),
+                selectors_sub=selectors_sub,
+                scores_sub=scores_sub,
+                lang=lang,
+            )
+            rawtext[i] = {"text": lang.resolve(translates, args)}
+        elif "rawtext" in element:
+            rawtext[i] = translate_tellraw(
+                {"rawtext": list(element["rawtext"])},
+                selectors_sub=selectors_sub,
+                scores_sub=scores_sub,
+                lang=lang,
+            )
 
     return {"rawtext": rawtext}
+
+
+def _translate_args(
+    with_param: list | dict | None,
+    *,
+    selectors_sub: dict[str, str],
+    scores_sub: dict[str, dict[str, int]],
+    lang: LangFile,
+) -> list[str]:
+    if with_param is None:
+        return []
+    if isinstance(with_param, list):
+        return [str(arg) for arg in with_param]
+    if isinstance(with_param, dict):
+        # 嵌套 rawtext 中的每个元素对应一个参数
+        nested = translate_tellraw(
+            {"rawtext": [dict(e) for e in with_param["rawtext"]]},
+            selectors_sub=selectors_sub,
+            scores_sub=scores_sub,
+            lang=lang,
+        )
+        return [rawtext_element_text(e) for e in nested["rawtext"]]
+    raise ValueError(
+        f"Invalid with param type; need list or dict, got {type(with_param).__name__}"
+    )
+
+
+def rawtext_element_text(element: dict) -> str:
+    if "text" in element:
+        return element["text"]
+    elif "rawtext" in element:
+        return "".join(rawtext_element_text(e) for e in element["rawtext"])
+    elif "translate" in element:
+        return element["translate"]
+    return ""
+
+
+def rawtext_runs(jsonc: dict) -> list[str]:
+    """
+    将已经过 translate_tellraw 处理的 rawtext 转为按元素划分的文本段。
+    """
+    return [rawtext_element_text(e) for e in jsonc["rawtext"]]
+
+
+def rawtext_to_text(jsonc: dict) -> str:
+    """
+    将已经过 translate_tellraw 处理的 rawtext 拼接为带 § 格式的文本。
+    """
+    return "".join(rawtext_runs(jsonc))
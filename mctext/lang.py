@@ -0,0 +1,190 @@
+import mmap
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+__all__ = ["LangFile", "LangStore", "format_translation"]
+
+RESOLVED_CACHE_SIZE = 8192
+
+_FMT_RE = re.compile(r"%(?:(\d+)\$)?([sd%])")
+
+
+def format_translation(template: str, args: List[str]) -> str:
+    """
+    按 Bedrock 规则替换翻译模板中的 %s / %d / %1$s / %% 占位符。
+
+    Args:
+        template (str): 翻译模板
+        args (list[str]): 替换参数
+
+    Returns:
+        str: 替换后的文本
+    """
+    if "%" not in template:
+        return template
+    seq = 0
+
+    def _sub(m: re.Match[str]) -> str:
+        nonlocal seq
+        pos, kind = m.groups()
+        if kind == "%":
+            return "%"
+        if pos is not None:
+            i = int(pos) - 1
+        else:
+            i = seq
+            seq += 1
+        if 0 <= i < len(args):
+            return args[i]
+        return ""
+
+    return _FMT_RE.sub(_sub, template)
+
+
+class LangFile:
+    """
+    单个语言的 .lang 文件。
+
+    文件以 mmap 方式打开, 首次查询时扫描一遍建立 键 -> (偏移, 长度) 的索引,
+    之后的查询只解码对应的值, 不再扫描整个文件。
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._size = 0
+        self._index: Optional[Dict[bytes, Tuple[int, int]]] = None
+        self.cached_text: Dict[str, Optional[str]] = {}
+        # 参数常随玩家名、分数变化, 只保留最近使用的结果
+        self.cached_resolved: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = (
+            OrderedDict()
+        )
+
+    def _open(self) -> mmap.mmap:
+        if self._mm is None:
+            with open(self.path, "rb") as f:
+                self._size = os.fstat(f.fileno()).st_size
+                if self._size == 0:
+                    # 空文件无法 mmap
+                    self._mm = mmap.mmap(-1, 1)
+                else:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _build_index(self) -> Dict[bytes, Tuple[int, int]]:
+        mm = self._open()
+        index: Dict[bytes, Tuple[int, int]] = {}
+        size = self._size
+        pos = 0
+        if mm[:3] == b"\xef\xbb\xbf":
+            pos = 3
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                end = size
+            line_end = end
+            if line_end > pos and mm[line_end - 1] == 0x0D:
+                line_end -= 1
+            eq = mm.find(b"=", pos, line_end)
+            if eq != -1 and mm[pos : pos + 2] != b"##":
+                key = mm[pos:eq].strip()
+                if key:
+                    # 值后以制表符开头的 ## 注释不属于文本
+                    val_end = mm.find(b"\t#", eq + 1, line_end)
+                    if val_end == -1:
+                        val_end = line_end
+                    index[key] = (eq + 1, val_end - eq - 1)
+            pos = end + 1
+        return index
+
+    @property
+    def index(self) -> Dict[bytes, Tuple[int, int]]:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def get(self, key: str) -> Optional[str]:
+        """获取键对应的原始翻译文本, 不存在时返回 None。"""
+        if key in self.cached_text:
+            return self.cached_text[key]
+        loc = self.index.get(key.encode("utf-8"))
+        if loc is None:
+            text = None
+        else:
+            offset, length = loc
+            text = self._open()[offset : offset + length].decode("utf-8").rstrip()
+        self.cached_text[key] = text
+        return text
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def resolve(self, key: str, args: List[str] | None = None) -> str:
+        """
+        获取键对应的翻译文本并替换参数。
+
+        键不存在时与游戏内行为一致, 直接以键本身作为模板。
+
+        Args:
+            key (str): 翻译键
+            args (list[str] | None): 替换参数
+
+        Returns:
+            str: 翻译后的文本
+        """
+        cache_key = (key, tuple(args or ()))
+        cached = self.cached_resolved.get(cache_key)
+        if cached is not None:
+            self.cached_resolved.move_to_end(cache_key)
+            return cached
+        template = self.get(key)
+        if template is None:
+            template = key
+        text = format_translation(template, list(cache_key[1]))
+        self.cached_resolved[cache_key] = text
+        if len(self.cached_resolved) > RESOLVED_CACHE_SIZE:
+            self.cached_resolved.popitem(last=False)
+        return text
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._index = None
+            self.cached_text.clear()
+            self.cached_resolved.clear()
+
+
+class LangStore:
+    """
+    按语言惰性加载 .lang 文件的集合。
+
+    Args:
+        root_dir (str): 存放 <locale>.lang 的目录 (例如资源包的 texts 目录)
+    """
+
+    def __init__(self, root_dir: str) -> None:
+        self.root_dir = root_dir
+        self.cached_locale: Dict[str, Optional[LangFile]] = {}
+
+    def get_locale(self, locale: str) -> Optional[LangFile]:
+        if locale in self.cached_locale:
+            return self.cached_locale[locale]
+        file_path = os.path.join(self.root_dir, f"{locale}.lang")
+        lang = LangFile(file_path) if os.path.exists(file_path) else None
+        self.cached_locale[locale] = lang
+        return lang
+
+    def __getitem__(self, locale: str) -> LangFile:
+        lang = self.get_locale(locale)
+        if lang is None:
+            raise KeyError(f"Language file for {locale} not found")
+        return lang
+
+    def close(self) -> None:
+        for lang in self.cached_locale.values():
+            if lang is not None:
+                lang.close()
+        self.cached_locale.clear()
@@ -1,6 +1,12 @@
 from typing import Callable
 from .define import CHAR_HORIZON_PADDING
-from .align import get_line_width, get_char_width
+from .align import (
+    FillerSolver,
+    WidthAccumulator,
+    default_filler_solver,
+    get_line_width,
+    get_char_width,
+)
 from .utils import solve_xy
 
 from typing import List, Tuple, Optional
@@ -50,27 +56,41 @@ def resolve(c: List[int]) -> Optional[List[Tuple[int, int]]]:
     raise ValueError
 
 
-def pad(texts: List[str]) -> List[str]:
-    cs = [get_line_width(t) for t in texts]
-    res = resolve(cs)
-    assert res is not None
-    pads = [
-        "§r"
-        + ((" " * ns) if ns > 0 else "")
-        + (("§l" + " " * nb + "§r") if nb > 0 else "")
-        for (ns, nb) in res
-    ]
+def pad(
+    texts: List[str],
+    widths: Optional[List[int]] = None,
+    solver: Optional[FillerSolver] = None,
+) -> List[str]:
+    cs = widths if widths is not None else [get_line_width(t) for t in texts]
+    pads = (solver or default_filler_solver).fill_column(cs)
+    assert pads is not None
     return [t + p for t, p in zip(texts, pads)]
 
 
 class Padder:
-    def __init__(self, text_lines: str, pad: Callable[[List[str]], List[str]]) -> None:
+    """
+    Args:
+        text_lines (str): 带 (pad1)、(pad2)... 标记的多行文本
+        pad: 填充函数
+        widths_aware (bool): 为 True 时以 pad(texts, widths) 调用填充函数,
+            传入已增量算好的行宽, 不再重新测量整行前缀
+    """
+
+    def __init__(
+        self,
+        text_lines: str,
+        pad: Callable[..., List[str]],
+        widths_aware: bool = False,
+    ) -> None:
         lines = text_lines.split("\n")
         self.pending_lines = lines
         self.padded = ["" for _ in lines]
+        # 已填充部分的宽度, 避免每一步都重新测量整行前缀
+        self._acc = [WidthAccumulator() for _ in lines]
         self._pad_i: int = 1
         self._pad_mark = self._pad_mark = f"(pad{self._pad_i})"
         self._pad = pad
+        self._widths_aware = widths_aware
 
     def _step(self):
         assert not self._all_done
@@ -82,10 +102,18 @@ class Padder:
             match_index.append(i)
             t, r = p.split(self._pad_mark, 1)
             self.pending_lines[i] = r
+            self._acc[i].append(t)
             match_list.append(c + t)
-        out = self._pad(match_list)
-        for i, o in zip(match_index, out):
+        if self._widths_aware:
+            out = self._pad(match_list, [self._acc[i].width for i in match_index])
+        else:
+            out = self._pad(match_list)
+        for i, m, o in zip(match_index, match_list, out):
             self.padded[i] = o
+            if o.startswith(m):
+                self._acc[i].append(o[len(m) :])
+            else:
+                self._acc[i] = WidthAccumulator(o)
         self._pad_i += 1
         self._pad_mark = f"(pad{self._pad_i})"
 
@@ -103,9 +131,19 @@ class Padder:
 
 
 def pad_with_format(
-    text: str, pad_fn: Optional[Callable[[List[str]], List[str]]] = None
+    text: str,
+    pad_fn: Optional[Callable[..., List[str]]] = None,
+    *,
+    widths_aware: Optional[bool] = None,
 ):
-    return Padder(text, pad_fn or pad)()
+    """
+    widths_aware 为 None 时, 仅在使用默认 pad 时传入行宽;
+    自定义的填充函数 (如 functools.partial(pad, solver=...)) 若接受
+    (texts, widths) 参数, 应显式传入 widths_aware=True。
+    """
+    if widths_aware is None:
+        widths_aware = pad_fn is None
+    return Padder(text, pad_fn or pad, widths_aware)()
 
 def pad_with_length(length: int, padder: str = "", _round=False):
     _length = length + CHAR_HORIZON_PADDING
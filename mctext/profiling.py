@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+__all__ = ["StageStats", "RenderProfiler", "profile"]
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class RenderProfiler:
+    """
+    记录渲染流水线各阶段的耗时、调用次数与缓存命中情况。
+
+    挂到 TellRawSimulator / RuneFont 的 profiler 属性上才会生效;
+    profiler 为 None (默认) 时各处只多一次 is None 判断。
+
+    阶段的耗时不含其中嵌套的阶段 (如 measure 中字体的 page_decode / glyph_crop),
+    各阶段之和即为总耗时, 不会重复计算。
+
+    Args:
+        on_stage (Callable[[str, float], None] | None):
+            每记录一次阶段耗时调用一次, 传入 (阶段名, 秒数)
+        on_count (Callable[[str, int], None] | None):
+            每次计数时调用, 传入 (计数名, 增量)
+        两者可用于导出到外部监控系统 (如分别对应直方图与计数器)
+    """
+
+    def __init__(
+        self,
+        on_stage: Optional[Callable[[str, float], None]] = None,
+        on_count: Optional[Callable[[str, int], None]] = None,
+    ):
+        self.on_stage = on_stage
+        self.on_count = on_count
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+        # 正在计时的阶段中, 已记录的嵌套阶段耗时
+        self._nested: List[float] = []
+
+    def add(self, stage: str, seconds: float) -> None:
+        st = self.stages.get(stage)
+        if st is None:
+            st = self.stages[stage] = StageStats()
+        st.calls += 1
+        st.total += seconds
+        if seconds > st.max:
+            st.max = seconds
+        if self._nested:
+            self._nested[-1] += seconds
+        if self.on_stage is not None:
+            self.on_stage(stage, seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+        if self.on_count is not None:
+            self.on_count(name, n)
+
+    def start(self) -> Tuple[float, int]:
+        """开始计时一个阶段, 返回值交给 stop()。"""
+        self._nested.append(0.0)
+        return perf_counter(), len(self._nested)
+
+    def stop(self, stage: str, token: Tuple[float, int]) -> None:
+        """结束计时, 记录扣除嵌套阶段后的耗时。"""
+        t0, depth = token
+        elapsed = perf_counter() - t0
+        nested = self._nested[depth - 1]
+        # 中途抛出异常而未结束的内层阶段一并丢弃
+        del self._nested[depth - 1 :]
+        self.add(stage, elapsed - nested)
+        if self._nested:
+            self._nested[-1] += nested
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        token = self.start()
+        try:
+            yield
+        finally:
+            self.stop(name, token)
+
+    def stats(self) -> dict:
+        return {
+            "stages": {
+                name: {
+                    "calls": st.calls,
+                    "total": st.total,
+                    "mean": st.mean,
+                    "max": st.max,
+                }
+                for name, st in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.counters.clear()
+        self._nested.clear()
+
+
+@contextmanager
+def profile(
+    *targets,
+    on_stage: Optional[Callable[[str, float], None]] = None,
+    on_count: Optional[Callable[[str, int], None]] = None,
+) -> Iterator[RenderProfiler]:
+    """
+    在 with 块内为 TellRawSimulator / RuneFont 挂上同一个 RenderProfiler,
+    退出时恢复原来的 profiler。TellRawSimulator 的字体也会一并挂上。
+
+    Example:
+        with profile(simulator) as prof:
+            simulator(text)
+        print(prof.stats())
+    """
+    prof = RenderProfiler(on_stage, on_count)
+    objs = []
+    for target in targets:
+        objs.append(target)
+        font = getattr(target, "font", None)
+        if font is not None and hasattr(font, "profiler"):
+            objs.append(font)
+    saved = [(obj, obj.profiler) for obj in objs]
+    for obj in objs:
+        obj.profiler = prof
+    try:
+        yield prof
+    finally:
+        for obj, old in saved:
+            obj.profiler = old
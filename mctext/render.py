@@ -1,9 +1,14 @@
+import threading
 from dataclasses import dataclass, field
+from typing import Iterable
 from PIL import Image
 from PIL.Image import Image as PILImage
 import numpy as np
 
+from .cmd_helper import rawtext_runs, translate_tellraw
 from .define import ITALIC_CHAR_HORIZON_PADDING
+from .lang import LangFile
+from .profiling import RenderProfiler
 from .render_core import (
     FontMaker,
     Font,
@@ -56,6 +61,19 @@ class SimulateOptions:
     )
 
 
+@dataclass
+class LayoutMetrics:
+    width: int
+    height: int
+    line_widths: list[int]
+    # 每行每个字符的 (x, y, w, h)
+    char_boxes: list[list[tuple[int, int, int, int]]]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+
 class TellRawSimulator:
     def __init__(
         self,
@@ -64,6 +82,7 @@ class TellRawSimulator:
     ) -> None:
         self.font = font
         self.opt = options
+        self.profiler: RenderProfiler | None = None
 
     def _draw(
         self,
@@ -89,18 +108,24 @@ class TellRawSimulator:
         return color
 
     def _split_format_and_text(
-        self, mix: str
+        self, mix: str | Iterable[str]
     ) -> tuple[list[list[str]], list[list[int]]]:
+        # mix 可以是多段文本 (例如 rawtext 的各个元素), 格式状态跨段延续
+        runs = (mix,) if isinstance(mix, str) else mix
         current_fmt = 0
-        lines = mix.split("\n")
         out_text: list[list[str]] = []
         out_fmt: list[list[int]] = []
         _is_fmt: bool = False
-        for line in lines:
-            _text: list[str] = []
-            _fmt: list[int] = []
-            for c in line:
-                if c == "§":
+        _text: list[str] = []
+        _fmt: list[int] = []
+        for run in runs:
+            for c in run:
+                if c == "\n":
+                    out_text.append(_text)
+                    out_fmt.append(_fmt)
+                    _text = []
+                    _fmt = []
+                elif c == "§":
                     if _is_fmt:
                         _text.append(c)
                         _fmt.append(current_fmt)
@@ -127,15 +152,15 @@ class TellRawSimulator:
                 else:
                     _text.append(c)
                     _fmt.append(current_fmt)
-            out_text.append(_text)
-            out_fmt.append(_fmt)
+        out_text.append(_text)
+        out_fmt.append(_fmt)
         return out_text, out_fmt
 
     def _get_line_width(self, line: list[str], fmt: list[int]):
         _last_fmt = 0
         _total_width = 0
         for w, f in zip(line, fmt):
-            _total_width += self.font(w, f & 0xFF80).width
+            _total_width += self.font.width(w, f & 0xFF80)
             # if f&FMT_Italic and not _last_fmt&FMT_Italic:
             #     _total_width+=8
             _last_fmt = f
@@ -143,11 +168,59 @@ class TellRawSimulator:
             _total_width += ITALIC_CHAR_HORIZON_PADDING
         return _total_width + max(0, len(line) - 1) * self.opt.font_horizon_padding
 
-    def __call__(self, text: str) -> PILImage:
+    def _measure_lines(
+        self, lines: list[list[str]], fmts: list[list[int]]
+    ) -> "LayoutMetrics":
+        line_widths: list[int] = []
+        char_boxes: list[list[tuple[int, int, int, int]]] = []
+        for line_i, (line, fmt) in enumerate(zip(lines, fmts)):
+            start_y = line_i * (31 + self.opt.line_padding)
+            start_x = 0
+            boxes: list[tuple[int, int, int, int]] = []
+            for c, f in zip(line, fmt):
+                w = self.font.width(c, f & 0xFF80)
+                boxes.append((start_x, start_y, w, 31))
+                start_x += w + self.opt.font_horizon_padding
+            char_boxes.append(boxes)
+            line_widths.append(self._get_line_width(line, fmt))
+        height = len(lines) * 31 + max(len(lines) - 1, 0) * self.opt.line_padding
+        return LayoutMetrics(max(line_widths), height, line_widths, char_boxes)
+
+    def measure(self, text: str | Iterable[str]) -> "LayoutMetrics":
+        """
+        只计算排版结果 (行宽、每个字符的包围盒与画布大小), 不进行绘制。
+
+        Args:
+            text (str | Iterable[str]): 文本, 或格式状态连续的多段文本
+
+        Returns:
+            LayoutMetrics: 排版结果
+        """
+        prof = self.profiler
+        if prof is not None:
+            token = prof.start()
+        lines, fmts = self._split_format_and_text(text)
+        if prof is not None:
+            prof.stop("parse", token)
+            token = prof.start()
+        metrics = self._measure_lines(lines, fmts)
+        if prof is not None:
+            prof.stop("measure", token)
+        return metrics
+
+    def __call__(self, text: str | Iterable[str]) -> PILImage:
+        prof = self.profiler
+        if prof is not None:
+            token = prof.start()
         lines, fmts = self._split_format_and_text(text)
+        if prof is not None:
+            prof.stop("parse", token)
+            token = prof.start()
         max_width = max(
             [self._get_line_width(line, fmt) for line, fmt in zip(lines, fmts)]
         )
+        if prof is not None:
+            prof.stop("measure", token)
         height = len(lines) * 31 + max(len(lines) - 1, 0) * self.opt.line_padding
         mat = np.zeros((height, max_width, 4), dtype=np.uint8)
         for line_i, (line, fmt) in enumerate(zip(lines, fmts)):
@@ -157,7 +230,11 @@ class TellRawSimulator:
             for i, (c, f) in enumerate(zip(line, fmt)):
                 pos = (start_x, start_y)
                 patch = self.font(c, f & 0xFF80)
+                if prof is not None:
+                    token = prof.start()
                 self._draw(mat, patch, pos, self._get_color(f))
+                if prof is not None:
+                    prof.stop("composite", token)
                 if f & FMT_Italic and italic_start_x == -1:
                     italic_start_x = start_x
 
@@ -168,12 +245,16 @@ class TellRawSimulator:
                     continue
 
                 italic_end_x = start_x - self.opt.font_horizon_padding
+                if prof is not None:
+                    token = prof.start()
                 italic_mat = _italic(
                     mat[start_y : start_y + 31, italic_start_x:italic_end_x]
                 )
                 w = italic_mat.shape[1]
                 paste_x = max(italic_start_x - 4, 0)
                 mat[start_y : start_y + 31, paste_x : paste_x + w] = italic_mat
+                if prof is not None:
+                    prof.stop("italic_shear", token)
                 # y_start=start_y-2
                 # for shift in [4,3,2,1,0,-1,-2,-3]:
                 #     y_end=y_start+4
@@ -183,7 +264,11 @@ class TellRawSimulator:
                 #     y_start=y_end
                 italic_start_x = -1
 
+        if prof is not None:
+            token = prof.start()
         image = Image.fromarray(mat)
+        if prof is not None:
+            prof.stop("fromarray", token)
         return image
 
 
@@ -215,3 +300,101 @@ def render(
         RuneFont(img_dir_path), options=opt or SimulateOptions()
     )
     return simulator(text)
+
+
+class _ThreadSafeRuneFont(RuneFont):
+    """多个线程共用的 RuneFont, 同一字形页只会被解码一次。"""
+
+    def __init__(self, root_dir: str) -> None:
+        super().__init__(root_dir)
+        self._lock = threading.Lock()
+        self._group_locks: dict[int, threading.Lock] = {}
+
+    def _get_group(self, group_idx: int):
+        if group_idx in self.cached_group:
+            return super()._get_group(group_idx)
+        with self._lock:
+            lock = self._group_locks.setdefault(group_idx, threading.Lock())
+        with lock:
+            return super()._get_group(group_idx)
+
+
+_fonts: dict[str, RuneFont] = {}
+_fonts_lock = threading.Lock()
+
+
+def _get_font(img_dir_path: str) -> RuneFont:
+    # 同一目录的字体在多次调用间 (包括 aio 的各个线程) 复用, 避免重复解码字形页
+    font = _fonts.get(img_dir_path)
+    if font is None:
+        with _fonts_lock:
+            font = _fonts.get(img_dir_path)
+            if font is None:
+                font = _fonts[img_dir_path] = _ThreadSafeRuneFont(img_dir_path)
+    return font
+
+
+def _tellraw_runs(
+    font: str | FontMaker,
+    jsonc: dict,
+    selectors_sub: dict[str, str] | None,
+    scores_sub: dict[str, dict[str, int]] | None,
+    lang: LangFile | None,
+    opt: SimulateOptions | None,
+) -> Tuple[TellRawSimulator, List[str]]:
+    if isinstance(font, str):
+        font = _get_font(font)
+    simulator = TellRawSimulator(font, options=opt or SimulateOptions())
+    translated = translate_tellraw(
+        {"rawtext": list(jsonc["rawtext"])},
+        selectors_sub=selectors_sub or {},
+        scores_sub=scores_sub or {},
+        lang=lang,
+    )
+    return simulator, rawtext_runs(translated)
+
+
+def render_tellraw(
+    font: str | FontMaker,
+    jsonc: dict,
+    *,
+    selectors_sub: dict[str, str] | None = None,
+    scores_sub: dict[str, dict[str, int]] | None = None,
+    lang: LangFile | None = None,
+    opt: SimulateOptions | None = None,
+) -> PILImage:
+    """
+    直接渲染 tellraw JSON, rawtext 的各个元素作为连续的文本段送入排版。
+
+    Args:
+        font (str | FontMaker): 字体, 或字形图片目录 (同一目录的字体会被复用)
+        jsonc (dict): tellraw JSON
+        selectors_sub (dict[str, str] | None): 选择器替换表
+        scores_sub (dict[str, dict[str, int]] | None): 计分板替换表
+        lang (LangFile | None): 用于翻译 translate 元素的语言文件
+        opt (SimulateOptions | None): 渲染选项
+
+    Returns:
+        PILImage: 渲染结果
+    """
+    simulator, runs = _tellraw_runs(font, jsonc, selectors_sub, scores_sub, lang, opt)
+    return simulator(runs)
+
+
+def measure_tellraw(
+    font: str | FontMaker,
+    jsonc: dict,
+    *,
+    selectors_sub: dict[str, str] | None = None,
+    scores_sub: dict[str, dict[str, int]] | None = None,
+    lang: LangFile | None = None,
+    opt: SimulateOptions | None = None,
+) -> LayoutMetrics:
+    """
+    只计算 tellraw JSON 的排版结果, 不进行绘制。参数与 render_tellraw 相同。
+
+    Returns:
+        LayoutMetrics: 排版结果
+    """
+    simulator, runs = _tellraw_runs(font, jsonc, selectors_sub, scores_sub, lang, opt)
+    return simulator.measure(runs)
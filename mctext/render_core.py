@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 import numpy as np
 
 from .define import CHAR_HORIZON_PADDING, SPACE_WIDTH
+from .profiling import RenderProfiler
 
 GRAY_NP_MATRIX = np.ndarray[tuple[int], np.dtype[np.uint8]]
 RGB_NP_MATRIX = np.ndarray[tuple[int, int, int], np.dtype[np.uint8]]
@@ -39,6 +40,9 @@ class FontMaker(ABC):
     def __call__(self, rune: str, fmt: int) -> Font:
         raise NotImplementedError
 
+    def width(self, rune: str, fmt: int) -> int:
+        return self(rune, fmt).width
+
     @staticmethod
     def rune_to_idx(rune: str):
         code = rune.encode(encoding="utf-16")[-2:]
@@ -66,27 +70,42 @@ class RuneFont(FontMaker):
 
         self.cached_group: Dict[int, Tuple[PILImage, bool]] = {}  # 16*32,16*32
         self.cached_rune: Dict[Tuple[str, int], Font] = {}  # 32*31
+        self.profiler: RenderProfiler | None = None
+
+    def _decode_group(self, group_idx: int) -> Tuple[PILImage, bool] | None:
+        file_path = os.path.join(self.root_dir, f"glyph_{group_idx:02X}.png")
+        if not os.path.exists(file_path):
+            return None
+        png = Image.open(file_path)
+        if png.mode != "RGBA":
+            png = png.convert("RGBA")
+        png = png.resize((512, 512), resample=Image.Resampling.NEAREST)
+        mat = np.array(png, dtype=np.uint8)
+        colored = not (
+            np.all(mat[:, :, 0] == mat[:, :, 1])
+            and np.all(mat[:, :, 1] == mat[:, :, 2])
+        )
+        if not colored:
+            png = png.convert("1")
+        return png, colored
 
     def _get_group(self, group_idx: int) -> Tuple[PILImage, bool] | None:
+        prof = self.profiler
         if group_idx in self.cached_group:
+            if prof is not None:
+                prof.count("page_cache.hit")
             return self.cached_group[group_idx]
         else:
-            file_path = os.path.join(self.root_dir, f"glyph_{group_idx:02X}.png")
-            if not os.path.exists(file_path):
+            if prof is not None:
+                prof.count("page_cache.miss")
+                token = prof.start()
+            page = self._decode_group(group_idx)
+            if prof is not None:
+                prof.stop("page_decode", token)
+            if page is None:
                 return None
-            png = Image.open(file_path)
-            if png.mode != "RGBA":
-                png = png.convert("RGBA")
-            png = png.resize((512, 512), resample=Image.Resampling.NEAREST)
-            mat = np.array(png, dtype=np.uint8)
-            colored = not (
-                np.all(mat[:, :, 0] == mat[:, :, 1])
-                and np.all(mat[:, :, 1] == mat[:, :, 2])
-            )
-            if not colored:
-                png = png.convert("1")
-            self.cached_group[group_idx] = (png, colored)
-            return png, colored
+            self.cached_group[group_idx] = page
+            return page
 
     @staticmethod
     def _tight_font(square: PILImage) -> PILImage:
@@ -97,22 +116,43 @@ class RuneFont(FontMaker):
             x1, y1, x2, y2 = bbox
         return square.crop((x1, 0, x2, 31))
 
+    def _crop_glyph(self, page, row: int, col: int) -> Font:
+        png, colored = page
+        posx = col * 32
+        posy = row * 32
+        cropped = png.crop((posx, posy, posx + 32, posy + 31))
+        tighted = self._tight_font(cropped)
+        # H,W
+        np_matrix = np.array(tighted, dtype=np.uint8)
+        return Font(np_matrix, colored)
+
+    def width(self, rune: str, fmt: int) -> int:
+        # 只需宽度时不必生成加粗等格式的字形矩阵
+        if (rune, fmt) in self.cached_rune:
+            if self.profiler is not None:
+                self.profiler.count("rune_cache.hit")
+            return self.cached_rune[(rune, fmt)].width
+        base = self(rune, 0)
+        if fmt & FMT_Bold and not base.colored:
+            return base.width + 2
+        return base.width
+
     def __call__(self, rune: str, fmt: int) -> Font:
+        prof = self.profiler
         if (rune, fmt) in self.cached_rune:
+            if prof is not None:
+                prof.count("rune_cache.hit")
             return self.cached_rune[(rune, fmt)]
+        if prof is not None:
+            prof.count("rune_cache.miss")
         g, r, c = self.rune_to_idx(rune)
         page = self._get_group(g)
         if page is None:
             assert rune != " "
             return self.__call__(" ", fmt)
-        png, colored = page
-        posx = c * 32
-        posy = r * 32
-        cropped = png.crop((posx, posy, posx + 32, posy + 31))
-        tighted = self._tight_font(cropped)
-        # H,W
-        np_matrix = np.array(tighted, dtype=np.uint8)
-        font = Font(np_matrix, colored)
+        if prof is not None:
+            token = prof.start()
+        font = self._crop_glyph(page, r, c)
         if fmt != 0 and not font.colored:
             font = font.clone()
             if fmt & FMT_Obfuscated:
@@ -135,6 +175,8 @@ class RuneFont(FontMaker):
                     nm[:, off : off - pad] |= mat[:, :]
                 font.mat = nm
         self.cached_rune[(rune, fmt)] = font
+        if prof is not None:
+            prof.stop("glyph_crop", token)
         return font
 
 
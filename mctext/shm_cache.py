@@ -0,0 +1,254 @@
+import hashlib
+import os
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+
+from .render_core import Font, RuneFont
+
+try:
+    import _posixshmem
+except ImportError:  # Windows: 最后一个句柄关闭时块自动释放
+    _posixshmem = None
+
+__all__ = ["SharedPage", "SharedGlyphCache", "SharedRuneFont"]
+
+# 共享内存块布局:
+#   [0]            状态: 0 写入中, 1 就绪, 2 字形页不存在
+#   [1]            是否为彩色字形页
+#   [2:514]        256 个字形的 (x1, x2) 紧凑包围盒
+#   [1024:]        512*512 的灰度 (0/1) 或 512*512*4 的 RGBA 字形页
+# 块大小统一按 RGBA 分配, 灰度页未写入的部分在 Linux 上不会占用物理内存。
+_STATE_WRITING = 0
+_STATE_READY = 1
+_STATE_ABSENT = 2
+_HEADER_SIZE = 1024
+_PAGE_SIZE = 512
+_BLOCK_SIZE = _HEADER_SIZE + _PAGE_SIZE * _PAGE_SIZE * 4
+
+
+def _open_shm(name: str, create: bool) -> shared_memory.SharedMemory:
+    # 块的生命周期由 SharedGlyphCache.unlink 管理, 不交给 resource_tracker,
+    # 否则任意一个进程退出时都会把其他进程仍在使用的块删除
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(
+            name, create=create, size=_BLOCK_SIZE if create else 0, track=False
+        )
+    shm = shared_memory.SharedMemory(
+        name, create=create, size=_BLOCK_SIZE if create else 0
+    )
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+def _unlink_name(name: str) -> None:
+    # 只删除名称, 不打开块; 已有的映射不受影响
+    if _posixshmem is None:
+        return
+    try:
+        _posixshmem.shm_unlink("/" + name)
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class SharedPage:
+    mat: np.ndarray
+    colored: bool
+    # (256, 2): 每个字形在 32 像素宽格子内的 x1, x2
+    bbox: np.ndarray
+
+
+class SharedGlyphCache:
+    """
+    以 multiprocessing.shared_memory 存放解码后的字形页与字形包围盒。
+
+    第一个加载某个字形页的进程负责解码并发布, 其他进程直接以只读方式映射,
+    不再重复解码。同一个字形目录在所有进程中对应同一组共享内存块。
+
+    共享内存块的名称由字形目录的路径及其中字形图片的修改时间和大小决定,
+    图片更新后会使用新的一组块, 不会读到旧的字形页。
+    共享内存块不会随进程退出自动删除, 应由主进程调用 unlink() 删除其名称。
+    已交出的字形页持有对映射的引用, close() / unlink() 之后仍可安全使用,
+    映射在这些字形页被回收后才解除。
+
+    Args:
+        root_dir (str): 字形图片目录
+        timeout (float): 等待其他进程发布字形页的最长时间 (秒), 超时后在本进程解码
+    """
+
+    def __init__(self, root_dir: str, *, timeout: float = 10.0) -> None:
+        self.root_dir = root_dir
+        self.timeout = timeout
+        self.prefix = f"mct_{self._digest(root_dir)[:10]}"
+        self._buffers: Dict[int, np.ndarray] = {}
+
+    @staticmethod
+    def _digest(root_dir: str) -> str:
+        sha = hashlib.sha1(os.path.abspath(root_dir).encode("utf-8"))
+        try:
+            names = sorted(os.listdir(root_dir))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if not (name.startswith("glyph_") and name.endswith(".png")):
+                continue
+            st = os.stat(os.path.join(root_dir, name))
+            sha.update(f"\0{name}:{st.st_mtime_ns}:{st.st_size}".encode("utf-8"))
+        return sha.hexdigest()
+
+    def _name(self, group_idx: int) -> str:
+        return f"{self.prefix}_{group_idx:02x}"
+
+    @staticmethod
+    def _buffer(shm: shared_memory.SharedMemory) -> np.ndarray:
+        # 只保留映射本身: 由此切出的数组都引用该 mmap, 最后一个被回收时映射才解除。
+        # SharedMemory 对象随即关闭, 免得它 (或其析构) 关闭仍被引用的映射
+        mm = shm._mmap  # type: ignore[attr-defined]
+        buf = np.frombuffer(mm, dtype=np.uint8, count=_BLOCK_SIZE)
+        shm._buf.release()  # type: ignore[attr-defined]
+        shm._buf = shm._mmap = None  # type: ignore[attr-defined]
+        shm.close()
+        return buf
+
+    def _view(self, buf: np.ndarray) -> SharedPage | None:
+        if buf[0] == _STATE_ABSENT:
+            return None
+        colored = bool(buf[1])
+        bbox = buf[2:514].reshape(256, 2)
+        data = buf[_HEADER_SIZE:]
+        if colored:
+            mat = data[: _PAGE_SIZE * _PAGE_SIZE * 4].reshape(_PAGE_SIZE, _PAGE_SIZE, 4)
+        else:
+            mat = data[: _PAGE_SIZE * _PAGE_SIZE].reshape(_PAGE_SIZE, _PAGE_SIZE)
+        mat.flags.writeable = False
+        bbox.flags.writeable = False
+        return SharedPage(mat, colored, bbox)
+
+    def _publish(self, buf: np.ndarray, font: RuneFont, group_idx: int):
+        page = font._decode_group(group_idx)
+        if page is None:
+            buf[0] = _STATE_ABSENT
+            return
+        png, colored = page
+        bbox = buf[2:514].reshape(256, 2)
+        for row in range(16):
+            for col in range(16):
+                posx, posy = col * 32, row * 32
+                box = png.crop((posx, posy, posx + 32, posy + 31)).getbbox()
+                if box is None:
+                    bbox[row * 16 + col] = (0, RuneFont.SPACE_WIDTH)
+                else:
+                    bbox[row * 16 + col] = (box[0], box[2])
+        mat = np.array(png, dtype=np.uint8)
+        buf[1] = int(colored)
+        buf[_HEADER_SIZE : _HEADER_SIZE + mat.size] = mat.reshape(-1)
+        # 状态最后写入, 其他进程看到就绪时数据已完整
+        buf[0] = _STATE_READY
+
+    def get_page(self, group_idx: int, font: RuneFont) -> SharedPage | None:
+        """
+        获取字形页; 尚未发布时由本进程解码并发布。
+
+        Returns:
+            SharedPage | None: 字形页, 对应的图片不存在时为 None
+        """
+        buf = self._buffers.get(group_idx)
+        if buf is None:
+            deadline = time.monotonic() + self.timeout
+            try:
+                shm = _open_shm(self._name(group_idx), create=True)
+            except FileExistsError:
+                shm = self._attach(group_idx, deadline)
+                if shm is None:
+                    # 块一直没有分配好 (创建者可能已崩溃), 在本进程中解码
+                    buf = np.zeros((_BLOCK_SIZE,), dtype=np.uint8)
+                    self._publish(buf, font, group_idx)
+                else:
+                    buf = self._buffer(shm)
+                    self._wait_ready(buf, group_idx, font, deadline)
+            else:
+                buf = self._buffer(shm)
+                self._publish(buf, font, group_idx)
+            self._buffers[group_idx] = buf
+        return self._view(buf)
+
+    def _attach(
+        self, group_idx: int, deadline: float
+    ) -> shared_memory.SharedMemory | None:
+        # 创建者在 shm_open 之后才设置块的大小, 此时映射空块会抛出 ValueError
+        while True:
+            try:
+                shm = _open_shm(self._name(group_idx), create=False)
+            except ValueError:
+                pass
+            else:
+                if shm.size >= _BLOCK_SIZE:
+                    return shm
+                shm.close()
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0.001)
+
+    def _wait_ready(self, buf: np.ndarray, group_idx: int, font, deadline: float):
+        while buf[0] == _STATE_WRITING:
+            if time.monotonic() > deadline:
+                # 发布者可能已崩溃, 由本进程重新写入
+                self._publish(buf, font, group_idx)
+                return
+            time.sleep(0.001)
+
+    def close(self) -> None:
+        """释放本对象对共享内存块的引用, 已交出的字形页不受影响。"""
+        self._buffers.clear()
+
+    def unlink(self) -> None:
+        """删除该字形目录对应的全部共享内存块的名称, 不影响已有的映射。"""
+        for group_idx in range(256):
+            _unlink_name(self._name(group_idx))
+
+
+class SharedRuneFont(RuneFont):
+    """
+    字形页存放在 SharedGlyphCache 中的 RuneFont。
+
+    字形矩阵是共享字形页的只读视图, 不会在每个进程中各复制一份;
+    带格式的字形 (粗体等) 仍在本进程中生成并缓存。
+    """
+
+    def __init__(self, root_dir: str, cache: Optional[SharedGlyphCache] = None):
+        super().__init__(root_dir)
+        self.shared = cache or SharedGlyphCache(root_dir)
+        self.cached_shared: Dict[int, Optional[SharedPage]] = {}
+
+    def close(self) -> None:
+        """清空本字体的字形缓存并关闭共享缓存。"""
+        self.cached_shared.clear()
+        self.cached_rune.clear()
+        self.shared.close()
+
+    def _get_group(self, group_idx: int) -> SharedPage | None:  # type: ignore[override]
+        prof = self.profiler
+        if group_idx in self.cached_shared:
+            if prof is not None:
+                prof.count("page_cache.hit")
+            return self.cached_shared[group_idx]
+        if prof is not None:
+            prof.count("page_cache.miss")
+            token = prof.start()
+        page = self.shared.get_page(group_idx, self)
+        self.cached_shared[group_idx] = page
+        if prof is not None:
+            prof.stop("page_decode", token)
+        return page
+
+    def _crop_glyph(self, page: SharedPage, row: int, col: int) -> Font:
+        x1, x2 = page.bbox[row * 16 + col]
+        posx = col * 32
+        posy = row * 32
+        mat = page.mat[posy : posy + 31, posx + int(x1) : posx + int(x2)]
+        return Font(mat, page.colored)
@@ -119,4 +119,52 @@ def solve_xy(S: int, B: int, c: int) -> tuple[int, int] | None:
         y = m - a * t
         return (x, y)
     else:
-        return None
\ No newline at end of file
+        return None
+
+class MinCountTable:
+    """
+    用给定的若干正整数凑出精确和, 且使用的数字个数最少 (完全背包)。
+
+    预先计算 0..max_value 的 DP 表, 查询时若超出范围则按需扩展。
+
+    Args:
+        costs: 可使用的数 (可重复使用)
+        max_value: 预先计算的最大和
+    """
+
+    def __init__(self, costs: list[int], max_value: int = 1024) -> None:
+        if not costs or any(c <= 0 for c in costs):
+            raise ValueError("costs 必须为正整数")
+        self.costs = list(costs)
+        self.gcd = math.gcd(*self.costs)
+        # count[v]: 凑出 v 所需的最少个数, -1 为无解; last[v]: 最后使用的下标
+        self.count: list[int] = [0]
+        self.last: list[int] = [-1]
+        self._extend(max_value)
+
+    def _extend(self, max_value: int) -> None:
+        count, last, costs = self.count, self.last, self.costs
+        for v in range(len(count), max_value + 1):
+            best, best_i = -1, -1
+            for i, c in enumerate(costs):
+                if c <= v and count[v - c] != -1:
+                    n = count[v - c] + 1
+                    if best == -1 or n < best:
+                        best, best_i = n, i
+            count.append(best)
+            last.append(best_i)
+
+    def solve(self, value: int) -> tuple[int, ...] | None:
+        """返回每个数的使用次数, 无解时返回 None。"""
+        if value < 0:
+            return None
+        if value >= len(self.count):
+            self._extend(max(value, 2 * len(self.count)))
+        if self.count[value] == -1:
+            return None
+        res = [0] * len(self.costs)
+        while value > 0:
+            i = self.last[value]
+            res[i] += 1
+            value -= self.costs[i]
+        return tuple(res)